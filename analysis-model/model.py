@@ -1,14 +1,19 @@
 
+import os
+
 import pandas as pd
-from langdetect import detect, DetectorFactory
+import torch
+import fasttext
 import spacy
 from sentence_transformers import SentenceTransformer
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
 import numpy as np
 import google.generativeai as genai  # Gemini SDK
 from sklearn.metrics import pairwise_distances_argmin_min
+import asyncio
+import datetime
 import json
-import time
+import pickle
 import pprint
 from google.api_core import exceptions
 
@@ -17,18 +22,25 @@ from google.api_core import exceptions
 # -----------------------------
 def get_representative_posts(cluster_id, embeddings, df, max_posts=5):
     mask = df["topic"] == cluster_id
-    cluster_embeddings = embeddings[mask]
+    cluster_embeddings = embeddings[mask].astype(np.float32, copy=False)
     cluster_texts = df.loc[mask, "text"].tolist()
     cluster_permalinks = df.loc[mask, "permalink"].tolist()
 
     if len(cluster_texts) == 0:
         return []
 
-    centroid = cluster_embeddings.mean(axis=0).reshape(1, -1)
-    sorted_idx = np.argsort(np.linalg.norm(cluster_embeddings - centroid, axis=1))
+    # Embeddings are unit-normalized at encode time, so ranking by cosine
+    # similarity to the (re-normalized) centroid is a single BLAS matvec;
+    # argpartition keeps only the top max_posts for sorting.
+    centroid = cluster_embeddings.mean(axis=0)
+    centroid /= np.linalg.norm(centroid) + 1e-12
+    sims = cluster_embeddings @ centroid
+    k = min(max_posts, len(sims))
+    top_idx = np.argpartition(-sims, k - 1)[:k]
+    top_idx = top_idx[np.argsort(-sims[top_idx])]
 
     selected = []
-    for i in sorted_idx[:max_posts]:
+    for i in top_idx:
         selected.append({
             "text": cluster_texts[i][:300],  # trim to avoid huge prompts
             "permalink": f"https://reddit.com{cluster_permalinks[i]}"
@@ -40,34 +52,111 @@ def get_representative_posts(cluster_id, embeddings, df, max_posts=5):
 # 1. Load & Preprocess Data
 # -----------------------------
 df = pd.read_csv("delhiDatacsv.csv")
-df["text"] = df["title"].fillna("") + " " + df["selftext"].fillna("")
-
-DetectorFactory.seed = 0
-df["language"] = df["text"].apply(lambda x: detect(x) if x.strip() else "unknown")
+# C-backed string concat, bounded length, then drop empty rows up front so
+# every later stage (spaCy, SBERT, clustering) sees a smaller N
+df["text"] = df["title"].fillna("").str.cat(df["selftext"].fillna(""), sep=" ").str.slice(0, 4000)
+df = df[df["text"].str.strip().str.len() > 0].reset_index(drop=True)
+
+# fastText language ID predicts over the whole list in C++ instead of
+# per-row Python; newlines are stripped because fastText treats them as
+# document separators.
+lid = fasttext.load_model("lid.176.bin")
+labels, _ = lid.predict([t.replace("\n", " ") for t in df["text"].tolist()], k=1)
+df["language"] = [l[0].replace("__label__", "") for l in labels]
 df = df[df["language"] == "en"]
 
+# Content hashes key the on-disk caches below, so warm re-runs only pay for
+# rows that are new or changed since the last execution
+text_hashes = pd.util.hash_pandas_object(df["text"], index=False).to_numpy()
+
 # spaCy tokens/entities (optional for analysis)
-nlp = spacy.load("en_core_web_sm")
-df["tokens"] = df["text"].apply(
-    lambda x: [t.lemma_.lower() for t in nlp(x) if not t.is_stop and t.is_alpha]
-)
-df["entities"] = df["text"].apply(
-    lambda x: [(ent.text, ent.label_) for ent in nlp(x).ents]
-)
+# Parse each document once via nlp.pipe (batched, multiprocess) and derive
+# both columns from the same docs; only the parser is disabled — the tagger
+# must stay on because the rule-based lemmatizer needs POS tags (spaCy W108).
+# Parses are cached on disk keyed by text hash.
+SPACY_CACHE = "spacy_cache.pkl"
+spacy_cache = {}
+if os.path.exists(SPACY_CACHE):
+    with open(SPACY_CACHE, "rb") as f:
+        spacy_cache = pickle.load(f)
+
+missing_idx = [i for i, h in enumerate(text_hashes) if h not in spacy_cache]
+if missing_idx:
+    nlp = spacy.load("en_core_web_sm", disable=["parser"])
+    texts = df["text"].tolist()
+    new_docs = nlp.pipe(
+        [texts[i] for i in missing_idx], batch_size=64, n_process=os.cpu_count()
+    )
+    for i, d in zip(missing_idx, new_docs):
+        spacy_cache[text_hashes[i]] = (
+            [t.lemma_.lower() for t in d if not t.is_stop and t.is_alpha],
+            [(ent.text, ent.label_) for ent in d.ents],
+        )
+    with open(SPACY_CACHE, "wb") as f:
+        pickle.dump(spacy_cache, f)
+
+df["tokens"] = [spacy_cache[h][0] for h in text_hashes]
+df["entities"] = [spacy_cache[h][1] for h in text_hashes]
 
 # -----------------------------
 # 2. Embeddings
 # -----------------------------
-model = SentenceTransformer("all-MiniLM-L6-v2")
-embeddings = model.encode(df["text"].tolist(), show_progress_bar=True)
+if torch.cuda.is_available():
+    model = SentenceTransformer("all-MiniLM-L6-v2", device="cuda")
+    model.half()  # FP16 inference roughly doubles throughput on GPU
+else:
+    torch.set_num_threads(os.cpu_count())
+    try:
+        # ONNX Runtime runs the graph-optimized MiniLM ~2-4x faster than
+        # eager PyTorch on CPU; encode() behaves identically.
+        model = SentenceTransformer("all-MiniLM-L6-v2", backend="onnx")
+    except (ImportError, ValueError) as e:
+        print(f"ONNX backend unavailable ({e}), using PyTorch")
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+
+# Truncate long outliers so batch padding stays bounded; encode() length-sorts
+# internally, so a large explicit batch keeps padding waste low.
+texts_for_embedding = df["text"].str.slice(0, 2000).tolist()
+
+# Embeddings are cached on disk by text hash so warm re-runs only encode
+# new rows; the resident matrix stays float16 to halve memory/bandwidth and
+# consumers cast back to float32 where the math requires it.
+EMBEDDING_CACHE = "embedding_cache.npz"
+embedding_cache = {}
+if os.path.exists(EMBEDDING_CACHE):
+    _cached = np.load(EMBEDDING_CACHE)
+    embedding_cache = dict(zip(_cached["hashes"].tolist(), _cached["embeddings"]))
+
+new_idx = [i for i, h in enumerate(text_hashes) if h not in embedding_cache]
+if new_idx:
+    new_embeddings = model.encode(
+        [texts_for_embedding[i] for i in new_idx],
+        batch_size=256,
+        show_progress_bar=True,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    ).astype(np.float16)
+    for i, vec in zip(new_idx, new_embeddings):
+        embedding_cache[text_hashes[i]] = vec
+    np.savez(
+        EMBEDDING_CACHE,
+        hashes=np.fromiter(embedding_cache.keys(), dtype=np.uint64),
+        embeddings=np.stack(list(embedding_cache.values())),
+    )
+
+embeddings = np.stack([embedding_cache[h] for h in text_hashes])
 
 
 # -----------------------------
 # 3. Clustering
 # -----------------------------
+# MiniBatchKMeans converges in mini-batch steps instead of full-batch Lloyd
+# iterations, which is far faster on the 384-d embedding matrix.
 NUM_TOPICS = 15
-clustering = KMeans(n_clusters=NUM_TOPICS, random_state=42)
-df["topic"] = clustering.fit_predict(embeddings)
+clustering = MiniBatchKMeans(
+    n_clusters=NUM_TOPICS, batch_size=4096, n_init=3, random_state=42
+)
+df["topic"] = clustering.fit_predict(embeddings.astype(np.float32))
 
 
 
@@ -76,30 +165,51 @@ df["topic"] = clustering.fit_predict(embeddings)
 # -----------------------------
 genai.configure(api_key="API_KEY_HERE")  # Replace with your actual API key
 
-def label_topic(cluster_id, docs):
+# Cap in-flight Gemini requests instead of sleeping between serial calls;
+# the semaphore keeps us under the RPM limit while all clusters label at once.
+GEMINI_MAX_CONCURRENCY = 5
+
+# The instruction prefix is identical for every cluster, so cache it
+# server-side and only send the per-cluster posts in each request. Short
+# prefixes below the cache minimum fall back to a plain system instruction.
+GEMINI_INSTRUCTION = (
+    "You are analyzing Reddit posts from Delhi. "
+    "Please give a short, human-readable topic name (2-5 words)."
+)
+try:
+    _cached_prefix = genai.caching.CachedContent.create(
+        model="models/gemini-1.5-flash",
+        system_instruction=GEMINI_INSTRUCTION,
+        ttl=datetime.timedelta(minutes=10),
+    )
+    gemini_model = genai.GenerativeModel.from_cached_content(_cached_prefix)
+except Exception as e:
+    print(f"Context caching unavailable ({e}), sending instruction per request")
+    gemini_model = genai.GenerativeModel(
+        "gemini-1.5-flash", system_instruction=GEMINI_INSTRUCTION
+    )
+
+async def label_topic(cluster_id, docs, semaphore):
     """Send only text snippets to Gemini"""
     formatted_docs = "\n".join([f"- {d['text']}" for d in docs])
 
     prompt = f"""
-    You are analyzing Reddit posts from Delhi.
     Here are some example posts from cluster {cluster_id}:
 
     {formatted_docs}
-
-    Please give a short, human-readable topic name (2-5 words).
     """
-    model = genai.GenerativeModel("gemini-1.5-flash")
     retries = 5
     delay = 5 # seconds
 
     for i in range(retries):
         try:
-            response = model.generate_content(prompt)
+            async with semaphore:
+                response = await gemini_model.generate_content_async(prompt)
             return response.text.strip()
         except exceptions.ResourceExhausted as e: # Catch the rate limit error
             if i < retries - 1:
                 print(f"Rate limit exceeded. Retrying in {delay} seconds...")
-                time.sleep(delay)
+                await asyncio.sleep(delay)
                 delay *= 2 # Exponential backoff
             else:
                 raise e # Re-raise the exception if all retries fail
@@ -113,12 +223,19 @@ def label_topic(cluster_id, docs):
 topic_labels = {}
 topic_representatives = {}
 
-for cluster_id in sorted(df["topic"].unique()):
-    cluster_docs = get_representative_posts(cluster_id, embeddings, df, max_posts=5)
-    docs_for_gemini = cluster_docs[:2]  # only first 2 posts go to Gemini
-    topic_labels[cluster_id] = label_topic(cluster_id, docs_for_gemini)
-    topic_representatives[cluster_id] = cluster_docs    #texts + permalinks
-    time.sleep(5)  # Increased delay to 5 seconds between requests
+async def label_all_clusters(cluster_ids):
+    semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    jobs = []
+    for cluster_id in cluster_ids:
+        cluster_docs = get_representative_posts(cluster_id, embeddings, df, max_posts=5)
+        docs_for_gemini = cluster_docs[:2]  # only first 2 posts go to Gemini
+        topic_representatives[cluster_id] = cluster_docs    #texts + permalinks
+        jobs.append(label_topic(cluster_id, docs_for_gemini, semaphore))
+    return await asyncio.gather(*jobs)
+
+cluster_ids = sorted(df["topic"].unique())
+labels = asyncio.run(label_all_clusters(cluster_ids))
+topic_labels = dict(zip(cluster_ids, labels))
 
 df["topic_label"] = df["topic"].map(topic_labels)
 
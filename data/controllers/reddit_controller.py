@@ -1,12 +1,19 @@
 import os
-import json
+import asyncio
+from datetime import datetime
+import orjson
 import asyncpraw
+from pymongo import UpdateOne
 from dotenv import load_dotenv
-from scripts.seedposts import seedposts
+from database.connectdb import get_async_collection
 
 # Load environment variables
 load_dotenv()
 
+# Posts are flushed to Mongo in bulks of this size while the scrape is
+# still running, so insert latency hides behind Reddit round-trips
+SEED_BATCH_SIZE = 500
+
 class RedditController:
     def __init__(self):
         """Initialize Reddit API client"""
@@ -16,14 +23,25 @@ class RedditController:
         
         if not all([self.client_id, self.client_secret, self.user_agent]):
             raise ValueError("Missing required Reddit API credentials in environment variables")
-    
+
+        # One asyncpraw session per controller; closed at app shutdown
+        self._reddit = None
+
     async def _get_reddit_instance(self):
-        """Get AsyncPRAW Reddit instance"""
-        return asyncpraw.Reddit(
-            client_id=self.client_id,
-            client_secret=self.client_secret,
-            user_agent=self.user_agent
-        )
+        """Get the shared AsyncPRAW Reddit instance, creating it on first use"""
+        if self._reddit is None:
+            self._reddit = asyncpraw.Reddit(
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                user_agent=self.user_agent
+            )
+        return self._reddit
+
+    async def close(self):
+        """Close the shared Reddit session (call at app shutdown)"""
+        if self._reddit is not None:
+            await self._reddit.close()
+            self._reddit = None
     
     async def scrape_posts(self, subreddit_name: str, listing_method: str = "hot", 
                     time_filter: str = "month"):
@@ -45,26 +63,32 @@ class RedditController:
             
             print(f"Fetching {listing_method} posts from r/{subreddit_name} for {time_filter} timeframe...")
             
-            # Get posts based on listing method (no limit for maximum data)
-            if listing_method == "hot":
-                posts = subreddit.hot(limit=None)
+            # Get posts based on listing method (no limit for maximum data).
+            # hot/rising listings aren't time-ordered, so a time-bounded scrape
+            # goes through the search endpoint where Reddit applies the filter
+            # server-side instead of breaking on created_utc client-side
+            if listing_method in ("hot", "rising"):
+                posts = subreddit.search("*", sort="new", time_filter=time_filter, limit=None)
             elif listing_method == "new":
                 posts = subreddit.new(limit=None)
             elif listing_method == "top":
                 posts = subreddit.top(time_filter=time_filter, limit=None)
-            elif listing_method == "rising":
-                posts = subreddit.rising(limit=None)
             else:
                 raise ValueError(f"Invalid listing method: {listing_method}. Use 'hot', 'new', 'top', or 'rising'")
-            
-            # import time
-            # six_months_ago = time.time() - (6 * 30 * 24 * 60 * 60)  # 6 months in seconds
-            
-            async for post in posts:
 
-                # if post.created_utc < six_months_ago:
+            # Stream posts into Mongo in bounded bulks instead of holding the
+            # full listing in memory; each flush runs as a task so DB writes
+            # overlap the scrape. Upserts on permalink keep re-scrapes idempotent
+            collection = get_async_collection(f"{subreddit_name.lower()}Data")
+            await collection.create_index("permalink", unique=True)
+            now = datetime.now()
+
+            dump_json = bool(os.getenv("DEBUG_DUMP_JSON"))
+            buffer = []
+            insert_tasks = []
+            posts_count = 0
 
-                
+            async for post in posts:
                 post_data = {
                     "title": post.title,
                     "selftext": post.selftext,
@@ -74,31 +98,42 @@ class RedditController:
                     "permalink": post.permalink,
                     "subreddit": subreddit_name.lower(),
                 }
-                posts_data.append(post_data)
-            
-            # Save to JSON file
-            json_filename = f"reddit_posts_{subreddit_name.lower().replace('+', '_')}_{listing_method}.json"
-            with open(json_filename, "w", encoding="utf-8") as f:
-                json.dump(posts_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"Successfully saved {len(posts_data)} posts to {json_filename}")
-            
-            # Close the reddit instance
-            await reddit.close()
-            
-            # Seed to MongoDB
-            try:
-                seedposts(subreddit_name, listing_method)
-                print("Successfully seeded data to MongoDB")
-            except Exception as e:
-                print(f"Error seeding to MongoDB: {e}")
-                print("Posts saved to JSON file only")
-            
+                posts_count += 1
+                if dump_json:
+                    posts_data.append(post_data)
+                buffer.append(UpdateOne(
+                    {"permalink": post_data["permalink"]},
+                    {"$setOnInsert": {**post_data, "created_at": now}},
+                    upsert=True
+                ))
+                if len(buffer) >= SEED_BATCH_SIZE:
+                    insert_tasks.append(asyncio.create_task(
+                        collection.bulk_write(buffer, ordered=False)
+                    ))
+                    buffer = []
+
+            if buffer:
+                insert_tasks.append(asyncio.create_task(
+                    collection.bulk_write(buffer, ordered=False)
+                ))
+            if insert_tasks:
+                await asyncio.gather(*insert_tasks)
+            print(f"Successfully seeded {posts_count} posts to MongoDB")
+
+            # Debug-only JSON dump of the scraped posts
+            json_filename = None
+            if dump_json:
+                json_filename = f"reddit_posts_{subreddit_name.lower().replace('+', '_')}_{listing_method}.json"
+                # orjson serializes in C and emits UTF-8 bytes directly
+                with open(json_filename, "wb") as f:
+                    f.write(orjson.dumps(posts_data, option=orjson.OPT_INDENT_2))
+                print(f"Successfully saved {len(posts_data)} posts to {json_filename}")
+
             return {
                 "success": True,
-                "message": f"Successfully scraped {len(posts_data)} posts",
+                "message": f"Successfully scraped {posts_count} posts",
                 "data": {
-                    "posts_count": len(posts_data),
+                    "posts_count": posts_count,
                     "json_file": json_filename,
                     "subreddit": subreddit_name,
                     "listing_method": listing_method,
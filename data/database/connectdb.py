@@ -1,31 +1,47 @@
 import os
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
+from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def connectdb():
-    """Connect to MongoDB using MONGO_URI from environment variables"""
+# Clients are created once per process and reused; each MongoClient owns a
+# connection pool, so constructing one per call re-pays TCP/TLS setup
+_client = None
+_async_client = None
+
+def _get_mongo_uri():
     mongo_uri = os.getenv("MONGO_URI")
-    
     if not mongo_uri:
         raise ValueError("MONGO_URI environment variable is not set")
-    
-    try:
-        # Create a new client and connect to the server
-        client = MongoClient(mongo_uri, server_api=ServerApi('1'))
-        # Send a ping to confirm a successful connection
-        client.admin.command('ping')
-        print("Pinged your deployment. You successfully connected to MongoDB!")
-        return client
-    except Exception as e:
-        print(f"Failed to connect to MongoDB: {e}")
-        raise
+    return mongo_uri
+
+def connectdb():
+    """Get the shared MongoDB client, connecting on first use"""
+    global _client
+    if _client is None:
+        try:
+            client = MongoClient(_get_mongo_uri(), server_api=ServerApi('1'), maxPoolSize=50)
+            # Send a ping to confirm a successful connection
+            client.admin.command('ping')
+            print("Pinged your deployment. You successfully connected to MongoDB!")
+            _client = client
+        except Exception as e:
+            print(f"Failed to connect to MongoDB: {e}")
+            raise
+    return _client
 
 def get_collection(collection_name: str):
     """Get a collection from the database"""
     client = connectdb()
     db = client.reddit_data  # Database name
     return db[collection_name]
+
+def get_async_collection(collection_name: str):
+    """Get a collection on the shared Motor client for async FastAPI handlers"""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncIOMotorClient(_get_mongo_uri(), server_api=ServerApi('1'), maxPoolSize=50)
+    return _async_client.reddit_data[collection_name]
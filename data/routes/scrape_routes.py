@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from controllers.reddit_controller import RedditController
@@ -9,37 +10,60 @@ router = APIRouter(prefix="/api", tags=["reddit-scraper"])
 # Initialize controller
 reddit_controller = RedditController()
 
+@router.on_event("shutdown")
+async def close_reddit_session():
+    """Close the shared AsyncPRAW session when the app shuts down"""
+    await reddit_controller.close()
+
 @router.get("/scrape")
 async def scrape_reddit_posts(
-    subreddit: str = Query(..., description="Name of the subreddit to scrape"),
+    subreddit: str = Query(..., description="Comma-separated subreddit name(s) to scrape"),
     method: str = Query("hot", description="Listing method: hot, new, top, rising"),
     time_filter: str = Query("month", description="Time filter: day, week, month, year, all")
 ):
     """
     Scrape Reddit posts using various listing methods
     
-    - **subreddit**: Name of the subreddit to scrape
+    - **subreddit**: Subreddit name(s) to scrape; comma-separate to scrape several in parallel
     - **method**: Listing method (hot, new, top, rising)
-    - **time_filter**: Time filter (only works with 'top' method: day, week, month, year, all)
-    
-    Note: For 'hot', 'new', and 'rising' methods, all posts from the last 6 months are fetched.
+    - **time_filter**: Time filter (day, week, month, year, all)
+
+    Note: For 'hot' and 'rising' methods, time-bounded posts are fetched server-side
+    via Reddit search; 'new' fetches all available posts.
     """
     try:
-        result = await reddit_controller.scrape_posts(
-            subreddit_name=subreddit,
-            listing_method=method,
-            time_filter=time_filter
-        )
-        
-        if result["success"]:
+        subreddit_names = [s.strip() for s in subreddit.split(",") if s.strip()]
+        if not subreddit_names:
+            raise HTTPException(status_code=400, detail="No subreddit name provided")
+
+        # Scrape all requested subreddits concurrently
+        results = await asyncio.gather(*[
+            reddit_controller.scrape_posts(
+                subreddit_name=name,
+                listing_method=method,
+                time_filter=time_filter
+            )
+            for name in subreddit_names
+        ])
+
+        failures = [r["message"] for r in results if not r["success"]]
+        if failures:
+            raise HTTPException(status_code=400, detail="; ".join(failures))
+
+        if len(results) == 1:
             return {
                 "status": "success",
-                "message": result["message"],
-                "data": result["data"]
+                "message": results[0]["message"],
+                "data": results[0]["data"]
             }
-        else:
-            raise HTTPException(status_code=400, detail=result["message"])
-            
+        return {
+            "status": "success",
+            "message": f"Successfully scraped {len(results)} subreddits",
+            "data": [r["data"] for r in results]
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
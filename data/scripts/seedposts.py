@@ -1,54 +1,63 @@
 import json
 import os
+import sys
+from datetime import datetime
+from pymongo import UpdateOne
 # from connectdb import get_collection
 from database.connectdb import get_collection
-from models.reddit_post import RedditPost
 
 def seedposts(subreddit_name: str = "pune", method: str = "hot"):
-    """Seed Reddit posts from JSON file to MongoDB"""
-    
-    # Load JSON data using new format
-    json_filename = f"reddit_posts_{subreddit_name.lower()}_{method}.json"
-    
+    """Re-seed a DEBUG_DUMP_JSON scrape dump into MongoDB
+
+    The live scrape path streams posts into Mongo directly; this script is the
+    manual recovery path for the JSON files written when the scraper runs with
+    DEBUG_DUMP_JSON set.
+    """
+
+    json_filename = f"reddit_posts_{subreddit_name.lower().replace('+', '_')}_{method}.json"
+
     if not os.path.exists(json_filename):
-        print(f"JSON file {json_filename} not found!")
+        print(f"JSON file {json_filename} not found! Run a scrape with DEBUG_DUMP_JSON=1 first.")
         return
-    
+
     try:
         with open(json_filename, 'r', encoding='utf-8') as f:
             posts_data = json.load(f)
-        
+
         # Get collection - will create if doesn't exist
         collection_name = f"{subreddit_name.lower()}Data"
         collection = get_collection(collection_name)
-        
-        # Clear all existing data in the collection
-        collection.delete_many({})
-        print(f"Cleared all existing data from {collection_name}")
-        
-        # Convert to RedditPost objects and insert
-        reddit_posts = []
+
+        # Unique index on permalink makes re-seeds idempotent upserts
+        # instead of delete_many + reinsert
+        collection.create_index("permalink", unique=True)
+
+        # Posts are already dicts in the right shape; stamp created_at once
+        # and upsert in a single unordered bulk so the server applies writes
+        # in parallel and one bad document doesn't abort the rest
+        now = datetime.now()
+        operations = []
         for post_data in posts_data:
-            try:
-                reddit_post = RedditPost.from_dict(post_data)
-                reddit_posts.append(reddit_post.to_dict())
-            except Exception as e:
-                print(f"Error processing post '{post_data.get('title', 'Unknown')}': {e}")
+            permalink = post_data.get("permalink", "")
+            if not permalink:
+                print(f"Skipping post without permalink: '{post_data.get('title', 'Unknown')}'")
                 continue
-        
-        if reddit_posts:
-            result = collection.insert_many(reddit_posts)
-            print(f"Successfully seeded {len(result.inserted_ids)} posts to {collection_name}")
-            
-            # Delete the temporary JSON file after successful MongoDB insertion
-            try:
-                os.remove(json_filename)
-                print(f"Deleted temporary file: {json_filename}")
-            except Exception as delete_error:
-                print(f"Warning: Could not delete temporary file {json_filename}: {delete_error}")
+            operations.append(UpdateOne(
+                {"permalink": permalink},
+                {"$setOnInsert": {**post_data, "created_at": now}},
+                upsert=True
+            ))
+
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            print(f"Successfully seeded {result.upserted_count} new posts to {collection_name} "
+                  f"({len(operations) - result.upserted_count} already present)")
         else:
             print("No valid posts to seed")
-            
+
     except Exception as e:
         print(f"Error seeding posts: {e}")
         raise
+
+if __name__ == "__main__":
+    seedposts(*sys.argv[1:3])
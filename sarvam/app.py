@@ -1,19 +1,36 @@
-from typing import Optional
-from fastapi import FastAPI, HTTPException
+import asyncio
+import hashlib
+from typing import List, Literal, Optional
+from fastapi import FastAPI, HTTPException, Request
+import orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from sarvamai import SarvamAI
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sarvamai import AsyncSarvamAI
 import logging
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# --- Settings ---
+# Env vars are resolved once here (pydantic-settings also reads .env itself,
+# replacing load_dotenv) instead of os.getenv lookups scattered per call site
+class Settings(BaseSettings):
+    sarvam_api_key: str = ""
+    # Total upstream concurrency across ALL workers; each worker process
+    # takes an equal share of this quota
+    sarvam_max_concurrency: int = 32
+    sarvam_workers: int = os.cpu_count() or 1
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+SETTINGS = Settings()
+
+# orjson serializes responses in C; handlers return plain dicts, so skipping
+# Pydantic response-model validation avoids a redundant pass per request
+app = FastAPI(default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,17 +39,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized bodies from the Content-Length header before they are
+# read, parsed, or validated; Sarvam would refuse them anyway
+MAX_BODY_BYTES = 1_000_000
+
+@app.middleware("http")
+async def reject_oversized_bodies(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return ORJSONResponse({"detail": "Request body too large"}, status_code=413)
+    return await call_next(request)
+
+# Single app-level handler for unexpected errors; the helper functions already
+# log and raise HTTPException, so endpoints don't need their own wrappers
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Unhandled error on {request.url.path}: {exc}")
+    return ORJSONResponse({"detail": str(exc)}, status_code=500)
+
 
 # --- Request Models ---
+# Valid source-language codes; Pydantic enforces membership at request parsing
+# (C-level set check), so invalid codes reject with a 422 before any handler runs
+LangCode = Literal[
+    "hi-IN", "bn-IN", "ta-IN", "te-IN", "gu-IN", "kn-IN", "ml-IN", "mr-IN",
+    "pa-IN", "od-IN", "en-IN", "as-IN", "brx-IN", "doi-IN", "ks-IN", "kok-IN",
+    "mai-IN", "mni-IN", "ne-IN", "sa-IN", "sat-IN", "sd-IN", "ur-IN"
+]
+
 class TranslationRequest(BaseModel):
-    text: str = Field(..., description="Text to translate to English")
-    source_language: str = Field(..., description="Source language code (e.g., 'hi-IN', 'bn-IN', etc.)")
+    text: str = Field(..., min_length=1, max_length=8000, description="Text to translate to English")
+    source_language: LangCode = Field(..., description="Source language code (e.g., 'hi-IN', 'bn-IN', etc.)")
 
 class AutoTranslateRequest(BaseModel):
-    text: str = Field(..., description="Text to auto-detect language and translate to English")
+    text: str = Field(..., min_length=1, max_length=8000, description="Text to auto-detect language and translate to English")
+
+class BatchTranslationRequest(BaseModel):
+    items: List[TranslationRequest] = Field(..., description="Texts to translate to English")
 
 # --- Constants ---
-SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
+SARVAM_API_KEY = SETTINGS.sarvam_api_key
+
+# One shared async client for the process: rebuilding it per request discards
+# the underlying HTTP connection pool and re-pays TLS/DNS on every call, and
+# the async variant keeps the event loop free during Sarvam round-trips
+SARVAM_CLIENT = AsyncSarvamAI(api_subscription_key=SARVAM_API_KEY)
 
 SUPPORTED_LANGUAGES = {
     "hi-IN": "हिंदी (Hindi)", "bn-IN": "বাংলা (Bengali)", "ta-IN": "தமிழ் (Tamil)",
@@ -45,23 +96,102 @@ SUPPORTED_LANGUAGES = {
     "sat-IN": "ᱥᱟᱱᱛᱟᱲᱤ (Santali)", "sd-IN": "سنڌي (Sindhi)", "ur-IN": "اردو (Urdu)"
 }
 
+# Precomputed once at import so the language-listing endpoints don't rebuild
+# dicts or scan lists per request
+_MAJOR_CODES = frozenset({
+    "hi-IN", "bn-IN", "ta-IN", "te-IN", "gu-IN", "kn-IN",
+    "ml-IN", "mr-IN", "pa-IN", "od-IN", "en-IN"
+})
+MAJOR_LANGUAGES = {c: n for c, n in SUPPORTED_LANGUAGES.items() if c in _MAJOR_CODES}
+ADDITIONAL_LANGUAGES = {c: n for c, n in SUPPORTED_LANGUAGES.items() if c not in _MAJOR_CODES}
+
+# Cap concurrent upstream calls so request bursts queue in-process instead of
+# blowing through Sarvam's quota and failing with 429s at the socket layer.
+# Semaphores are per-process, so each of the sarvam_workers processes gets an
+# equal share of the global sarvam_max_concurrency quota.
+SARVAM_SEM = asyncio.Semaphore(
+    max(1, SETTINGS.sarvam_max_concurrency // SETTINGS.sarvam_workers)
+)
+
+async def _call_sarvam(call, **kwargs):
+    """Run a Sarvam SDK call under the concurrency cap, retrying throttling/5xx with backoff"""
+    delay = 1
+    for attempt in range(4):
+        async with SARVAM_SEM:
+            try:
+                return await call(**kwargs)
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                if attempt < 3 and (status == 429 or (status is not None and status >= 500)):
+                    logger.warning(f"Sarvam returned {status}, retrying in {delay}s...")
+                else:
+                    raise
+        await asyncio.sleep(delay)
+        delay *= 2
+
+# --- Response Caches ---
+# Reddit text repeats heavily (reposts, quoted text, common slogans), and a
+# cache hit skips an entire Sarvam round-trip. Keys are blake2b digests of
+# the text, prefixed with the source language for translations. Insertion
+# order doubles as a FIFO eviction order once the cap is reached.
+_CACHE_MAX_ENTRIES = 10000
+_translation_cache: dict = {}
+_detection_cache: dict = {}
+
+def _cache_key(text: str, source_language: str = "") -> str:
+    digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    return f"{source_language}:{digest}"
+
+def _cache_put(cache: dict, key: str, value: dict):
+    if len(cache) >= _CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+# Already-English input is the common case, so its response templates are
+# built once and only the text fields get filled in per request
+_EN_AUTO_TEMPLATE = {
+    "detected_language": "en-IN",
+    "detected_language_name": "English",
+    "target_language": "en-IN",
+    "target_language_name": "English",
+    "confidence": None,
+    "note": "Text is already in English"
+}
+
+_EN_TRANSLATE_TEMPLATE = {
+    "source_language": "en-IN",
+    "target_language": "en-IN",
+    "source_language_name": "English",
+    "target_language_name": "English",
+    "note": "Text is already in English"
+}
+
+def _english_passthrough(text: str, template: dict = _EN_AUTO_TEMPLATE) -> dict:
+    """Response for input that is already English, without an upstream call"""
+    return {"original_text": text, "translated_text": text, **template}
+
 # --- Language Detection Function ---
 async def detect_language(text: str) -> dict:
     """
     Detect the language of input text using Sarvam AI identify_language endpoint
     """
+    cache_key = _cache_key(text)
+    cached = _detection_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        client = SarvamAI(api_subscription_key=SARVAM_API_KEY)
-        
         # Use the correct method name: identify_language
-        response = client.text.identify_language(input=text)
-        
-        return {
+        response = await _call_sarvam(SARVAM_CLIENT.text.identify_language, input=text)
+
+        result = {
             "detected_language_code": response.language_code,
             "detected_language_name": SUPPORTED_LANGUAGES.get(response.language_code, "Unknown"),
             "confidence": getattr(response, 'confidence', None)
         }
-        
+        _cache_put(_detection_cache, cache_key, result)
+        return dict(result)
+
     except Exception as e:
         logger.error(f"Language detection error: {e}")
         raise HTTPException(status_code=500, detail=f"Language detection failed: {str(e)}")
@@ -71,11 +201,27 @@ async def translate_text_to_english(text: str, source_language: str) -> dict:
     """
     Translate text from supported Indian languages to English using Sarvam AI translate endpoint
     """
+    # Empty/whitespace-only input needs no round-trip
+    if not text.strip():
+        return {
+            "original_text": text,
+            "translated_text": text,
+            "source_language": source_language,
+            "target_language": "en-IN",
+            "source_language_name": SUPPORTED_LANGUAGES.get(source_language, "Unknown"),
+            "target_language_name": "English",
+            "note": "Text is empty"
+        }
+
+    cache_key = _cache_key(text, source_language)
+    cached = _translation_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        client = SarvamAI(api_subscription_key=SARVAM_API_KEY)
-        
         # Use the translate endpoint
-        response = client.text.translate(
+        response = await _call_sarvam(
+            SARVAM_CLIENT.text.translate,
             input=text,
             source_language_code=source_language,
             target_language_code="en-IN",
@@ -83,8 +229,8 @@ async def translate_text_to_english(text: str, source_language: str) -> dict:
             mode="classic-colloquial",
             enable_preprocessing=False,
         )
-        
-        return {
+
+        result = {
             "original_text": text,
             "translated_text": response.translated_text,
             "source_language": source_language,
@@ -92,7 +238,9 @@ async def translate_text_to_english(text: str, source_language: str) -> dict:
             "source_language_name": SUPPORTED_LANGUAGES.get(source_language, "Unknown"),
             "target_language_name": "English"
         }
-        
+        _cache_put(_translation_cache, cache_key, result)
+        return dict(result)
+
     except Exception as e:
         logger.error(f"Translation error: {e}")
         raise HTTPException(status_code=500, detail=f"Translation failed: {str(e)}")
@@ -100,9 +248,61 @@ async def translate_text_to_english(text: str, source_language: str) -> dict:
 # --- Auto Translate Function ---
 async def auto_translate_to_english(text: str) -> dict:
     """
-    Automatically detect language using identify_language endpoint and then translate to English
+    Translate text to English, letting Sarvam detect the source language server-side
+    in a single translate call; falls back to detect-then-translate if "auto" is rejected
     """
+    # Empty/whitespace-only input needs no round-trip
+    if not text.strip():
+        return {
+            "original_text": text,
+            "translated_text": text,
+            "detected_language": "en-IN",
+            "detected_language_name": "English",
+            "target_language": "en-IN",
+            "target_language_name": "English",
+            "confidence": None,
+            "note": "Text is empty"
+        }
+
+    # Pure-ASCII text is overwhelmingly English on Reddit; skip the upstream
+    # round-trip entirely for that common case
+    if text.isascii():
+        return _english_passthrough(text)
+
     try:
+        # Fast path: one RPC with source auto-detection instead of
+        # identify_language followed by translate
+        try:
+            response = await _call_sarvam(
+                SARVAM_CLIENT.text.translate,
+                input=text,
+                source_language_code="auto",
+                target_language_code="en-IN",
+                speaker_gender="Male",
+                mode="classic-colloquial",
+                enable_preprocessing=False,
+            )
+            detected_language = getattr(response, "source_language_code", None)
+            if detected_language:
+                detected_language_name = SUPPORTED_LANGUAGES.get(detected_language, "Unknown")
+                if detected_language == "en-IN":
+                    return _english_passthrough(text)
+                return {
+                    "original_text": text,
+                    "translated_text": response.translated_text,
+                    "source_language": detected_language,
+                    "target_language": "en-IN",
+                    "source_language_name": detected_language_name,
+                    "target_language_name": "English",
+                    "detected_language": detected_language,
+                    "detected_language_name": detected_language_name,
+                    "confidence": None
+                }
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.warning(f"Auto-source translate failed ({e}), falling back to detect + translate")
+
         # Step 1: Detect language using identify_language endpoint
         logger.info(f"Detecting language for text: {text[:50]}...")
         detection_result = await detect_language(text)
@@ -113,14 +313,8 @@ async def auto_translate_to_english(text: str) -> dict:
         # Step 2: If already English, return as is
         if detected_language == "en-IN":
             return {
-                "original_text": text,
-                "translated_text": text,
-                "detected_language": detected_language,
-                "detected_language_name": "English",
-                "target_language": "en-IN",
-                "target_language_name": "English",
-                "confidence": detection_result.get("confidence"),
-                "note": "Text is already in English"
+                **_english_passthrough(text),
+                "confidence": detection_result.get("confidence")
             }
         
         # Step 3: Translate to English using translate endpoint
@@ -140,80 +334,90 @@ async def auto_translate_to_english(text: str) -> dict:
         raise HTTPException(status_code=500, detail=f"Auto translation failed: {str(e)}")
 
 # --- Endpoint: /translate ---
-@app.post("/translate")
+@app.post("/translate", response_model=None)
 async def translate_text(req: TranslationRequest) -> dict:
     """
     Translate text from specified Indian language to English
     """
-    try:
-        # Validate source language
-        if req.source_language not in SUPPORTED_LANGUAGES:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported language code: {req.source_language}. Supported languages: {list(SUPPORTED_LANGUAGES.keys())}"
-            )
-        
-        # Don't translate if already English
-        if req.source_language == "en-IN":
-            return {
-                "original_text": req.text,
-                "translated_text": req.text,
-                "source_language": req.source_language,
-                "target_language": "en-IN",
-                "source_language_name": "English",
-                "target_language_name": "English",
-                "note": "Text is already in English"
-            }
-        
-        logger.info(f"Translating from {req.source_language} to English: {req.text[:50]}...")
-        return await translate_text_to_english(req.text, req.source_language)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Translation endpoint error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    # Source language is validated by Pydantic (LangCode) at request parsing
+
+    # Don't translate if already English
+    if req.source_language == "en-IN":
+        return _english_passthrough(req.text, _EN_TRANSLATE_TEMPLATE)
+
+    logger.info(f"Translating from {req.source_language} to English: {req.text[:50]}...")
+    return await translate_text_to_english(req.text, req.source_language)
+
+# --- Endpoint: /translate/batch ---
+@app.post("/translate/batch", response_model=None)
+async def translate_batch(req: BatchTranslationRequest) -> dict:
+    """
+    Translate multiple texts to English in one request; items are dispatched
+    concurrently so wall time is ~max(item latency) instead of the sum
+    """
+    logger.info(f"Batch translating {len(req.items)} items...")
+    results = await asyncio.gather(
+        *[translate_text_to_english(item.text, item.source_language) for item in req.items],
+        return_exceptions=True
+    )
+
+    translations = []
+    for item, result in zip(req.items, results):
+        if isinstance(result, Exception):
+            translations.append({"original_text": item.text, "error": str(result)})
+        else:
+            translations.append(result)
+
+    return {"translations": translations, "count": len(translations)}
 
 # --- Endpoint: /auto-translate ---
-@app.post("/auto-translate")
-async def auto_translate_text(req: AutoTranslateRequest) -> dict:
+@app.post("/auto-translate", response_model=None)
+async def auto_translate_text(req: AutoTranslateRequest, stream: bool = False):
     """
     Automatically detect language and translate text to English
-    Uses detect-language endpoint first, then translate endpoint
+
+    Pass ?stream=true to receive the detection result as soon as it lands,
+    followed by the translation, as newline-delimited JSON
     """
-    try:
-        logger.info(f"Auto-translating text: {req.text[:50]}...")
+    logger.info(f"Auto-translating text: {req.text[:50]}...")
+    if not stream:
         return await auto_translate_to_english(req.text)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Auto-translate endpoint error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+    async def stages():
+        # Streaming deliberately runs the explicit two-step path so the
+        # detection stage can be emitted before translation finishes
+        detection = await detect_language(req.text)
+        yield orjson.dumps({"stage": "detect", **detection}) + b"\n"
+
+        detected_language = detection["detected_language_code"]
+        if detected_language == "en-IN":
+            result = {
+                "original_text": req.text,
+                "translated_text": req.text,
+                "note": "Text is already in English"
+            }
+        else:
+            result = await translate_text_to_english(req.text, detected_language)
+        yield orjson.dumps({"stage": "translate", **result}) + b"\n"
+
+    return StreamingResponse(stages(), media_type="application/x-ndjson")
 
 # --- Endpoint: /detect-language ---
-@app.post("/detect-language")
+@app.post("/detect-language", response_model=None)
 async def detect_text_language(req: AutoTranslateRequest) -> dict:
     """
     Detect the language of input text using Sarvam AI identify_language endpoint
     """
-    try:
-        logger.info(f"Detecting language for text: {req.text[:50]}...")
-        return await detect_language(req.text)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Language detection endpoint error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    logger.info(f"Detecting language for text: {req.text[:50]}...")
+    return await detect_language(req.text)
 
 # --- Endpoint: /health ---
-@app.get("/health")
+@app.get("/health", response_model=None)
 async def health_check() -> dict:
     return {"status": "healthy", "service": "sarvam-translation-api"}
 
 # --- Endpoint: /supported_languages ---
-@app.get("/supported_languages")
+@app.get("/supported_languages", response_model=None)
 async def get_supported_languages() -> dict:
     """
     Get list of supported source languages for translation to English
@@ -225,37 +429,39 @@ async def get_supported_languages() -> dict:
     }
 
 # --- Endpoint: /languages/major ---
-@app.get("/languages/major")
+@app.get("/languages/major", response_model=None)
 async def get_major_languages() -> dict:
     """
     Get major Indian languages supported for translation
     """
-    major_languages = {code: name for code, name in SUPPORTED_LANGUAGES.items() if code in [
-        "hi-IN", "bn-IN", "ta-IN", "te-IN", "gu-IN", "kn-IN",
-        "ml-IN", "mr-IN", "pa-IN", "od-IN", "en-IN"
-    ]}
     return {
-        "major_languages": major_languages,
+        "major_languages": MAJOR_LANGUAGES,
         "target_language": "en-IN (English)",
-        "count": len(major_languages)
+        "count": len(MAJOR_LANGUAGES)
     }
 
 # --- Endpoint: /languages/additional ---
-@app.get("/languages/additional")
+@app.get("/languages/additional", response_model=None)
 async def get_additional_languages() -> dict:
     """
     Get additional Indian languages supported for translation
     """
-    additional_languages = {code: name for code, name in SUPPORTED_LANGUAGES.items() if code in [
-        "as-IN", "brx-IN", "doi-IN", "ks-IN", "kok-IN",
-        "mai-IN", "mni-IN", "ne-IN", "sa-IN", "sat-IN", "sd-IN", "ur-IN"
-    ]}
     return {
-        "additional_languages": additional_languages,
+        "additional_languages": ADDITIONAL_LANGUAGES,
         "target_language": "en-IN (English)",
-        "count": len(additional_languages)
+        "count": len(ADDITIONAL_LANGUAGES)
     }
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # One worker per core plus the uvloop/httptools stack; the import string
+    # (rather than the app object) is required for multi-worker mode
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=SETTINGS.sarvam_workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="info",
+    )
\ No newline at end of file